@@ -1,10 +1,146 @@
 import os
+import asyncio
 import json
-from typing import List, Dict
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional
 
+import httpx
 import litellm
-from pydantic import BaseModel, ValidationError
-from graph import TaskGraph
+import msgspec
+from graph import TaskGraph, Node, Edge, DependencyType
+
+logger = logging.getLogger(__name__)
+
+_TASKGRAPH_SCHEMA = msgspec.json.schema(TaskGraph)
+_TASKGRAPH_SCHEMA_STR = json.dumps(_TASKGRAPH_SCHEMA, indent=2)
+
+# Worked example for the prompt, built from the structs so it always
+# matches the schema
+_EXAMPLE_GOAL = "Launch a personal blog"
+_EXAMPLE_GRAPH = TaskGraph(
+    nodes={
+        node.id: node
+        for node in (
+            Node(
+                id="t1",
+                description="Choose a blogging platform and hosting plan",
+                outputs={"platform": "static site generator"},
+            ),
+            Node(
+                id="t2",
+                description="Register a domain name",
+                outputs={"domain": "the blog's address"},
+            ),
+            Node(
+                id="t3",
+                description="Set up the site and connect the domain",
+                inputs={"platform": "from t1", "domain": "from t2"},
+                outputs={"site_url": "live, empty site"},
+            ),
+            Node(
+                id="t4",
+                description="Write the first three articles",
+                outputs={"articles": "three drafts"},
+            ),
+            Node(
+                id="t5",
+                description="Publish the articles and announce the blog",
+                inputs={"site_url": "from t3", "articles": "from t4"},
+            ),
+        )
+    },
+    edges=[
+        Edge(
+            source="t1",
+            target="t3",
+            data_transfer={"platform": "chosen platform"},
+        ),
+        Edge(
+            source="t2",
+            target="t3",
+            data_transfer={"domain": "registered domain"},
+        ),
+        Edge(
+            source="t3", target="t5", data_transfer={"site_url": "live site"}
+        ),
+        Edge(source="t4", target="t5", data_transfer={"articles": "drafts"}),
+        Edge(
+            source="t1",
+            target="t4",
+            dependency_type=DependencyType.soft,
+        ),
+    ],
+)
+_EXAMPLE_GRAPH_STR = msgspec.json.format(
+    msgspec.json.encode(_EXAMPLE_GRAPH), indent=2
+).decode()
+
+# Static instructions, schema and example: identical for every request, so
+# providers can cache this prefix. It is kept above OpenAI's 1024-token
+# minimum for automatic prefix caching.
+_SYSTEM_PROMPT = f"""
+Decompose the user's goal into a task graph.
+
+Guidelines:
+- Each node is one concrete, actionable task that a single person or
+  agent can complete; its description starts with a verb.
+- Node IDs are short, unique strings, and every key of "nodes" equals the
+  "id" of the node it maps to.
+- Add an edge from task A to task B when B cannot start before A is done.
+  Use "hard" for strict prerequisites and "soft" when A only helps B.
+- The graph must be acyclic: no task may depend, directly or
+  indirectly, on itself.
+- Describe what a task needs in "inputs" and what it produces in
+  "outputs"; when an edge carries one of those values, name it in the
+  edge's "data_transfer".
+- Leave every "status" as "pending".
+- Tasks that do not depend on each other should not be linked, so that
+  they can run in parallel.
+- Respect the task limit given with the goal; merge small steps rather
+  than dropping parts of the goal.
+
+Schema: {_TASKGRAPH_SCHEMA_STR}
+
+Example goal: {_EXAMPLE_GOAL}
+Example output:
+{_EXAMPLE_GRAPH_STR}
+
+output the task graph in JSON format
+"""
+_GRAPH_CACHE_SIZE = 512
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+_HTTP_TIMEOUT = 30
+
+
+def _merge_duplicate_tasks(task_graph: TaskGraph) -> TaskGraph:
+    """Collapse nodes whose descriptions match, rewiring their edges."""
+    seen: Dict[str, str] = {}
+    alias: Dict[str, str] = {}
+    nodes = {}
+    for node_id, node in task_graph.nodes.items():
+        kept_id = seen.setdefault(node.description.strip().lower(), node_id)
+        alias[node_id] = kept_id
+        if kept_id == node_id:
+            nodes[node_id] = node
+
+    if len(nodes) == len(task_graph.nodes):
+        return task_graph
+
+    edges = []
+    seen_edges = set()
+    for edge in task_graph.edges:
+        source = alias.get(edge.source, edge.source)
+        target = alias.get(edge.target, edge.target)
+        # Merging can turn an edge into a self-loop or a duplicate
+        if source == target or (source, target) in seen_edges:
+            continue
+        seen_edges.add((source, target))
+        edges.append(
+            msgspec.structs.replace(edge, source=source, target=target)
+        )
+    return TaskGraph(nodes=nodes, edges=edges)
 
 
 class TaskPlannerAgent:
@@ -14,39 +150,148 @@ class TaskPlannerAgent:
         if not self.openai_api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set.")
         litellm.api_key = self.openai_api_key
+        if litellm.client_session is None:
+            # One keep-alive HTTP/2 pool shared by every agent in the process
+            litellm.client_session = httpx.Client(
+                http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+            )
+        self._system_message = self._make_system_message()
+        self._graph_cache: OrderedDict = OrderedDict()
+        # The UI shares one agent across sessions, each on its own thread
+        self._cache_lock = threading.Lock()
 
-    def _generate_graph(self, goal: str, max_tasks: int = 7) -> TaskGraph:
-        schema = TaskGraph.model_json_schema(mode="validation")
-        prompt = f"""
-        Decompose the following goal into a task graph. Do not generate more than {max_tasks} tasks.
+    def _provider(self) -> Optional[str]:
+        # litellm also routes bare "claude-*" names to Anthropic, so ask it
+        # rather than matching a prefix
+        try:
+            return litellm.get_llm_provider(self.model)[1]
+        except Exception:
+            return None
 
+    def _make_system_message(self) -> Dict:
+        content = {"type": "text", "text": _SYSTEM_PROMPT}
+        if self._provider() == "anthropic":
+            # Anthropic only caches prefixes explicitly marked as cacheable;
+            # OpenAI caches prefixes of 1024+ tokens automatically.
+            content["cache_control"] = {"type": "ephemeral"}
+        return {"role": "system", "content": [content]}
+
+    def _build_messages(self, goal: str, max_tasks: int) -> List[Dict]:
+        # Static instructions and schema go first so the provider can cache
+        # the prefix; only the goal varies between requests.
+        user_prompt = f"""
         Goal: {goal}
-        Schema: {schema}
-        output the task graph in JSON format
+        Do not generate more than {max_tasks} tasks.
         """
+        return [
+            self._system_message,
+            {"role": "user", "content": user_prompt},
+        ]
 
+    def _parse_response(self, response) -> TaskGraph:
+        try:
+            task_graph = msgspec.json.decode(
+                response["choices"][0]["message"]["content"], type=TaskGraph
+            )
+            return _merge_duplicate_tasks(task_graph)
+        except msgspec.ValidationError as e:
+            logger.error("Validation error: %s, Response: %s", e, response)
+            return TaskGraph()
+        except (msgspec.DecodeError, KeyError, IndexError) as e:
+            logger.error(
+                "Error processing OpenAI response: %s, Response: %s",
+                e,
+                response,
+            )
+            return TaskGraph()  # Return empty graph on error
+
+    def _generate_graph(self, goal: str, max_tasks: int = 7) -> TaskGraph:
         try:
             response = litellm.completion(
                 model=self.model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=self._build_messages(goal, max_tasks),
                 response_format={"type": "json_object"},
             )
-            graph_data = json.loads(
-                response["choices"][0]["message"]["content"]
-            )
-            task_graph = TaskGraph.model_validate(graph_data)
-            return task_graph
-        except (json.JSONDecodeError, KeyError, IndexError) as e:
-            print(
-                f"Error processing OpenAI response: {e}, Response: {response}"
-            )
-            return TaskGraph()  # Return empty graph on error
-        except ValidationError as e:
-            print(f"Validation error: {e}, Response: {response}")
+            return self._parse_response(response)
+        except Exception as e:
+            logger.error("An unexpected error occurred: %s", e)
             return TaskGraph()
+
+    async def _generate_graph_async(
+        self, goal: str, max_tasks: int = 7
+    ) -> TaskGraph:
+        try:
+            response = await litellm.acompletion(
+                model=self.model,
+                messages=self._build_messages(goal, max_tasks),
+                response_format={"type": "json_object"},
+            )
+            return self._parse_response(response)
         except Exception as e:
-            print(f"An unexpected error occurred: {e}")
+            logger.error("An unexpected error occurred: %s", e)
             return TaskGraph()
 
+    def _cache_get(self, key) -> Optional[TaskGraph]:
+        with self._cache_lock:
+            cached = self._graph_cache.get(key)
+            if cached is None:
+                return None
+            self._graph_cache.move_to_end(key)
+        # Hand out a fresh copy so callers can't mutate the cached graph
+        return msgspec.json.decode(cached, type=TaskGraph)
+
+    def _cache_put(self, key, task_graph: TaskGraph):
+        # Empty graphs are what errors fall back to; don't pin them
+        if not task_graph.nodes:
+            return
+        encoded = msgspec.json.encode(task_graph)
+        with self._cache_lock:
+            self._graph_cache[key] = encoded
+            if len(self._graph_cache) > _GRAPH_CACHE_SIZE:
+                self._graph_cache.popitem(last=False)
+
     def process_goal(self, goal: str, max_tasks: int = 5) -> TaskGraph:
-        return self._generate_graph(goal, max_tasks)
+        key = (self.model, goal, max_tasks)
+        task_graph = self._cache_get(key)
+        if task_graph is None:
+            task_graph = self._generate_graph(goal, max_tasks)
+            self._cache_put(key, task_graph)
+        return task_graph
+
+    async def process_goal_async(
+        self, goal: str, max_tasks: int = 5
+    ) -> TaskGraph:
+        key = (self.model, goal, max_tasks)
+        task_graph = self._cache_get(key)
+        if task_graph is None:
+            task_graph = await self._generate_graph_async(goal, max_tasks)
+            self._cache_put(key, task_graph)
+        return task_graph
+
+    async def _process_goals_async(
+        self, goals: List[str], max_tasks: int
+    ) -> List[TaskGraph]:
+        # Repeated goals would all miss the cache at once; plan each only once
+        unique = list(dict.fromkeys(goals))
+        planned = await asyncio.gather(
+            *(self.process_goal_async(goal, max_tasks) for goal in unique)
+        )
+        graphs = dict(zip(unique, planned))
+        results = []
+        handed_out = set()
+        for goal in goals:
+            task_graph = graphs[goal]
+            if goal in handed_out:
+                # Later copies of a goal get their own graph to mutate
+                task_graph = msgspec.json.decode(
+                    msgspec.json.encode(task_graph), type=TaskGraph
+                )
+            handed_out.add(goal)
+            results.append(task_graph)
+        return results
+
+    def process_goals(
+        self, goals: List[str], max_tasks: int = 5
+    ) -> List[TaskGraph]:
+        """Plan several goals concurrently, returning graphs in input order."""
+        return asyncio.run(self._process_goals_async(goals, max_tasks))
@@ -1,7 +1,8 @@
-from typing import Dict, List, Optional, Union, Literal
-from pydantic import BaseModel, Field
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union, Literal
+import msgspec
 import networkx as nx
 import uuid
+from collections import deque
 from enum import Enum
 
 
@@ -17,54 +18,94 @@ class DependencyType(str, Enum):
     soft = "soft"
 
 
-class Edge(BaseModel):
+class Edge(msgspec.Struct):
     source: str
     target: str
     dependency_type: DependencyType = DependencyType.hard
     data_transfer: Optional[Dict] = None
 
 
-class Node(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class Node(msgspec.Struct, kw_only=True):
+    id: str = msgspec.field(default_factory=lambda: uuid.uuid4().hex)
     description: str
     status: NodeStatus = NodeStatus.pending
     inputs: Optional[Dict] = None
     outputs: Optional[Dict] = None
 
+    def _attrs(self) -> Dict:
+        """Return the node's attributes, excluding its ID."""
+        return {
+            "description": self.description,
+            "status": self.status,
+            "inputs": self.inputs,
+            "outputs": self.outputs,
+        }
+
 
-class TaskGraph(BaseModel):
+class TaskGraph(msgspec.Struct, dict=True):
     nodes: Dict[str, Node] = {}
     edges: List[Edge] = []
-    _graph: Optional[nx.DiGraph] = None
-
-    def __init__(self, **data):
-        super().__init__(**data)
-        self._graph = nx.DiGraph()
-        self._build_graph()
-
-    def _build_graph(self):
-        """Build NetworkX graph from nodes and edges."""
-        self._graph.clear()
-
-        # Add nodes
-        for node_id, node in self.nodes.items():
-            self._graph.add_node(node_id, **node.dict(exclude={"id"}))
 
-        # Add edges
-        for edge in self.edges:
-            self._graph.add_edge(
-                edge.source,
-                edge.target,
-                dependency_type=edge.dependency_type,
-                data_transfer=edge.data_transfer,
-            )
+    def __post_init__(self):
+        # Adjacency maps (node ID -> ordered set of neighbour IDs, stored as
+        # dict keys to keep insertion order stable)
+        self._succ: Dict[str, Dict[str, None]] = {}
+        self._pred: Dict[str, Dict[str, None]] = {}
+        # Node ID -> indices into self.edges of the edges touching it
+        self._edge_index: Dict[str, Set[int]] = {}
+        # Bumped by every mutation, so callers can cache derived data
+        self._version = 0
+        for node_id in self.nodes:
+            self._succ[node_id] = {}
+            self._pred[node_id] = {}
+        for i, edge in enumerate(self.edges):
+            self._link(edge.source, edge.target)
+            self._index_edge(i, edge)
+
+    @property
+    def version(self) -> int:
+        """Counter incremented each time the graph is modified."""
+        return self._version
+
+    def _link(self, source: str, target: str):
+        """Record an edge in the adjacency maps."""
+        self._succ.setdefault(source, {})[target] = None
+        self._pred.setdefault(source, {})
+        self._succ.setdefault(target, {})
+        self._pred.setdefault(target, {})[source] = None
+
+    def _index_edge(self, i: int, edge: Edge):
+        """Record that the edge at position i touches its endpoints."""
+        self._edge_index.setdefault(edge.source, set()).add(i)
+        self._edge_index.setdefault(edge.target, set()).add(i)
+
+    def _remove_edge_at(self, i: int):
+        """Remove self.edges[i] by swapping the last edge into its slot."""
+        edge = self.edges[i]
+        for endpoint in (edge.source, edge.target):
+            indices = self._edge_index.get(endpoint)
+            if indices is not None:
+                indices.discard(i)
+
+        last = len(self.edges) - 1
+        if i != last:
+            moved = self.edges[last]
+            self.edges[i] = moved
+            for endpoint in (moved.source, moved.target):
+                indices = self._edge_index.get(endpoint)
+                if indices is not None:
+                    indices.discard(last)
+                    indices.add(i)
+        self.edges.pop()
 
     def add_node(self, description: str, **attributes) -> str:
         """Add a node to the graph and return its ID."""
-        node_id = str(uuid.uuid4())
+        node_id = uuid.uuid4().hex
         node = Node(id=node_id, description=description, **attributes)
         self.nodes[node_id] = node
-        self._graph.add_node(node_id, **node.dict(exclude={"id"}))
+        self._succ[node_id] = {}
+        self._pred[node_id] = {}
+        self._version += 1
         return node_id
 
     def add_edge(
@@ -85,12 +126,9 @@ class TaskGraph(BaseModel):
             data_transfer=data_transfer,
         )
         self.edges.append(edge)
-        self._graph.add_edge(
-            source,
-            target,
-            dependency_type=dependency_type,
-            data_transfer=data_transfer,
-        )
+        self._link(source, target)
+        self._index_edge(len(self.edges) - 1, edge)
+        self._version += 1
 
     def update_node_status(self, node_id: str, status: NodeStatus):
         """Update the status of a node."""
@@ -98,7 +136,7 @@ class TaskGraph(BaseModel):
             raise ValueError(f"Node {node_id} doesn't exist")
 
         self.nodes[node_id].status = status
-        self._graph.nodes[node_id]["status"] = status
+        self._version += 1
 
     def get_node(self, node_id: str) -> Optional[Node]:
         """Get a node by ID."""
@@ -109,14 +147,14 @@ class TaskGraph(BaseModel):
         if node_id not in self.nodes:
             raise ValueError(f"Node {node_id} doesn't exist")
 
-        return list(self._graph.predecessors(node_id))
+        return list(self._pred[node_id])
 
     def get_successors(self, node_id: str) -> List[str]:
         """Get successor node IDs for a given node."""
         if node_id not in self.nodes:
             raise ValueError(f"Node {node_id} doesn't exist")
 
-        return list(self._graph.successors(node_id))
+        return list(self._succ[node_id])
 
     def remove_node(self, node_id: str):
         """Remove a node and all its connected edges from the graph."""
@@ -126,41 +164,87 @@ class TaskGraph(BaseModel):
         # Remove the node from the dictionary
         del self.nodes[node_id]
 
-        # Remove edges involving this node
-        self.edges = [
-            e for e in self.edges if e.source != node_id and e.target != node_id
-        ]
-
-        # Update the NetworkX graph
-        self._graph.remove_node(node_id)
+        # Remove edges involving this node, highest index first so that
+        # swapped-in edges are never ones still waiting to be removed
+        for i in sorted(self._edge_index.pop(node_id, ()), reverse=True):
+            self._remove_edge_at(i)
+
+        # Update the adjacency maps
+        for succ_id in self._succ.pop(node_id):
+            del self._pred[succ_id][node_id]
+        for pred_id in self._pred.pop(node_id):
+            del self._succ[pred_id][node_id]
+        self._version += 1
+
+    def _topological_order(self) -> List[str]:
+        """Kahn's algorithm; the result is short of some nodes on a cycle."""
+        in_degree = {n: len(preds) for n, preds in self._pred.items()}
+        queue = deque(n for n, d in in_degree.items() if d == 0)
+        order = []
+        while queue:
+            node_id = queue.popleft()
+            order.append(node_id)
+            for succ_id in self._succ[node_id]:
+                in_degree[succ_id] -= 1
+                if in_degree[succ_id] == 0:
+                    queue.append(succ_id)
+        return order
 
     def is_dag(self) -> bool:
         """Check if the graph is a directed acyclic graph."""
-        return nx.is_directed_acyclic_graph(self._graph)
+        return len(self._topological_order()) == len(self._succ)
 
     def get_critical_path(self) -> List[str]:
         """Get the critical path of the graph."""
-        if not self.is_dag():
+        # A single Kahn pass both orders the nodes and detects cycles
+        order = self._topological_order()
+        if len(order) < len(self._succ):
             raise ValueError("Graph must be a DAG to compute critical path")
-
-        # Use topological sort to get the critical path
-        return list(nx.topological_sort(self._graph))
+        return order
 
     def get_leaf_nodes(self) -> List[str]:
         """Get all leaf nodes (nodes with no successors)."""
-        return [n for n in self.nodes if self._graph.out_degree(n) == 0]
+        return [n for n in self.nodes if not self._succ[n]]
 
     def get_root_nodes(self) -> List[str]:
         """Get all root nodes (nodes with no predecessors)."""
-        return [n for n in self.nodes if self._graph.in_degree(n) == 0]
+        return [n for n in self.nodes if not self._pred[n]]
+
+    def nodes_iter(self) -> Iterator[Tuple[str, Node]]:
+        """Iterate over (node ID, node) pairs."""
+        return iter(self.nodes.items())
+
+    def edges_iter(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over distinct (source, target) pairs."""
+        return (
+            (source, target)
+            for source, targets in self._succ.items()
+            for target in targets
+        )
 
     def to_networkx(self) -> nx.DiGraph:
-        """Return the NetworkX graph representation."""
-        return self._graph
+        """Build a NetworkX graph representation (for layout algorithms)."""
+        graph = nx.DiGraph()
+        graph.add_nodes_from(
+            (node_id, node._attrs()) for node_id, node in self.nodes.items()
+        )
+        graph.add_edges_from(
+            (
+                edge.source,
+                edge.target,
+                {
+                    "dependency_type": edge.dependency_type,
+                    "data_transfer": edge.data_transfer,
+                },
+            )
+            for edge in self.edges
+        )
+        return graph
 
     def to_dict(self) -> Dict:
         """Convert the graph to a dictionary for serialization."""
-        return {
-            "nodes": {k: v.dict() for k, v in self.nodes.items()},
-            "edges": [e.dict() for e in self.edges],
-        }
+        return msgspec.to_builtins(self)
+
+    def to_json_bytes(self) -> bytes:
+        """Encode the graph straight to JSON, skipping the dict step."""
+        return msgspec.json.encode(self)
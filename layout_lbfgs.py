@@ -0,0 +1,61 @@
+import networkx as nx
+import numpy as np
+from scipy import sparse
+from scipy.optimize import minimize
+from scipy.spatial.distance import pdist, squareform
+
+
+def lbfgs_layout(
+    G: nx.Graph, seed: int = 42, max_iter: int = 100, gravity: float = 0.01
+) -> dict:
+    """Force-directed layout solved as an energy minimization with L-BFGS.
+
+    Nodes repel each other with energy 1/d, edges pull their endpoints
+    together with energy d², and a weak gravity term keeps disconnected
+    components from drifting apart. Positions are rescaled to [-1, 1].
+    """
+    nodes = list(G.nodes())
+    n = len(nodes)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {nodes[0]: (0.0, 0.0)}
+
+    index = {node: i for i, node in enumerate(nodes)}
+    rows, cols = [], []
+    for u, v in G.edges():
+        if u != v:
+            rows += [index[u], index[v]]
+            cols += [index[v], index[u]]
+    adjacency = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(n, n)
+    )
+    adjacency.data[:] = 1.0  # Collapse duplicate edges
+    laplacian = sparse.diags(np.asarray(adjacency.sum(axis=1)).ravel())
+    laplacian = (laplacian - adjacency).tocsr()
+
+    def energy_and_grad(flat):
+        X = flat.reshape(n, 2)
+        dist = np.maximum(pdist(X), 1e-9)
+        LX = laplacian @ X
+        energy = np.sum(1.0 / dist) + np.sum(X * LX) + gravity * np.sum(X * X)
+
+        # Repulsion gradient: -sum_j (x_i - x_j) / d_ij³, expanded so that
+        # no (n, n, 2) difference tensor is needed
+        inv_cube = squareform(1.0 / dist**3)
+        grad = inv_cube @ X - inv_cube.sum(axis=1)[:, None] * X
+        grad += 2.0 * LX + 2.0 * gravity * X
+        return energy, grad.ravel()
+
+    rng = np.random.default_rng(seed)
+    x0 = rng.uniform(-1.0, 1.0, size=2 * n)
+    result = minimize(
+        energy_and_grad,
+        x0,
+        jac=True,
+        method="L-BFGS-B",
+        options={"maxiter": max_iter},
+    )
+
+    pos = nx.rescale_layout(result.x.reshape(n, 2))
+    return {node: (float(x), float(y)) for node, (x, y) in zip(nodes, pos)}
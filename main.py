@@ -1,12 +1,17 @@
 import streamlit as st
 import networkx as nx
+import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 import os
-import json
+import textwrap
+from collections import defaultdict
+import msgspec
 
 # Import our custom modules
 from graph import TaskGraph, Node, NodeStatus, DependencyType
 from agent import TaskPlannerAgent
+from layout_lbfgs import lbfgs_layout
 
 from dotenv import load_dotenv
 
@@ -17,32 +22,79 @@ st.set_page_config(
     page_title="GMind - Task Planning", page_icon="🧠", layout="wide"
 )
 
+# Node statuses, in selectbox order, and their position in that order
+STATUS_OPTIONS = ("pending", "in_progress", "completed", "failed")
+STATUS_INDEX = {status: i for i, status in enumerate(STATUS_OPTIONS)}
+# Order of the status groups in the task list
+STATUS_ORDER = ("in_progress", "pending", "completed", "failed")
+
+# Node status colors, indexed by STATUS_INDEX: one palette index per node
+# instead of a color string
+STATUS_PALETTE = [
+    "lightgray",  # Gris pour pending
+    "blue",  # Vous pouvez ajuster cette couleur
+    "green",  # Vert pour done
+    "red",  # Rouge pour fail
+]
+STATUS_COLORSCALE = [
+    [i / (len(STATUS_PALETTE) - 1), color]
+    for i, color in enumerate(STATUS_PALETTE)
+]
+
+# Word-wrap les étiquettes à 20 caractères par ligne
+LABEL_WRAPPER = textwrap.TextWrapper(width=20, break_long_words=True)
+
 # Initialize session state
 if "graph" not in st.session_state:
     st.session_state.graph = TaskGraph()
 if "selected_node" not in st.session_state:
     st.session_state.selected_node = None
-if "agent" not in st.session_state:
-    st.session_state.agent = TaskPlannerAgent()
-    # api_key_anthropic = os.getenv("ANTHROPIC_API_KEY", "")
-    # api_key_cerebras = os.getenv("CEREBRAS_API_KEY", "")
-    # if api_key_cerebras:
-    #     st.session_state.agent = TaskPlannerAgent(api_key=api_key_cerebras)
-    # else:
-    #     st.session_state.agent = None
+if "tasks_editor_version" not in st.session_state:
+    st.session_state.tasks_editor_version = 0
 
 
 # Functions for UI interactions
+@st.cache_resource
+def get_agent():
+    """Return the planner agent shared by all sessions, or None if no key."""
+    try:
+        return TaskPlannerAgent()
+    except ValueError:
+        return None
+
+
 def update_node_status(node_id: str, new_status: str):
     """Update the status of a node in the graph."""
     st.session_state.graph.update_node_status(node_id, new_status)
 
 
+def apply_task_list_edits(editor_key: str, node_ids: list):
+    """Apply the status edits made in the task list table."""
+    edited_rows = st.session_state[editor_key]["edited_rows"]
+    for row, changes in edited_rows.items():
+        if "status" in changes:
+            update_node_status(node_ids[int(row)], changes["status"])
+
+    # Start the next render from a fresh editor, with no stale edits
+    st.session_state.tasks_editor_version += 1
+
+
 def select_node(node_id: str):
     """Set the selected node in the session state."""
     st.session_state.selected_node = node_id
 
 
+def select_node_from_chart():
+    """Select the node clicked in the graph view."""
+    for point in st.session_state.graph_plot.selection.points:
+        if "customdata" in point:
+            if point["customdata"] != st.session_state.selected_node:
+                select_node(point["customdata"])
+                # The detail panel lives outside the graph fragment
+                st.session_state._selection_changed = True
+            break
+
+
 def create_graph_from_goal():
     """Create a graph from the user's goal using the agent."""
     goal = st.session_state.goal_input
@@ -50,8 +102,13 @@ def create_graph_from_goal():
         st.warning("Please enter a goal.")
         return
 
+    agent = get_agent()
+    if agent is None:
+        st.error("OPENAI_API_KEY environment variable not set.")
+        return
+
     with st.spinner("Generating plan..."):
-        st.session_state.graph = st.session_state.agent.process_goal(goal)
+        st.session_state.graph = agent.process_goal(goal)
 
 
 def add_task_manually():
@@ -68,63 +125,54 @@ def add_task_manually():
     )
     dependencies = [dep.strip() for dep in dependencies if dep.strip()]
 
-    node_id = st.session_state.graph.add_node(description=description)
+    graph = st.session_state.graph
+    node_id = graph.add_node(description=description)
 
     for dep_id in dependencies:
-        if dep_id in st.session_state.graph.nodes:
-            st.session_state.graph.add_edge(source=dep_id, target=node_id)
+        if dep_id in graph.nodes:
+            graph.add_edge(source=dep_id, target=node_id)
 
 
 def advance_graph():
-    """Progress in the graph by advancing nodes through their lifecycle based on topological order.
+    """Progress in the graph by advancing nodes through their lifecycle.
 
     Flow: pending -> in_progress -> completed
     """
     graph = st.session_state.graph
 
-    # Vérifier si le graphe est un DAG
-    if not graph.is_dag():
-        st.error(
-            "Le graphe contient des cycles et ne peut pas être avancé automatiquement."
-        )
-        return
-
-    # Obtenir l'ordre topologique des nœuds
-    try:
-        topo_order = graph.get_critical_path()
-    except Exception as e:
-        st.error(f"Erreur lors du calcul de l'ordre topologique: {str(e)}")
-        return
+    # Nombre de prédécesseurs non terminés pour chaque nœud
+    remaining = {}
+    for node_id in graph.nodes:
+        count = 0
+        for pred_id in graph.get_predecessors(node_id):
+            pred = graph.get_node(pred_id)
+            if pred is None or pred.status != "completed":
+                count += 1
+        remaining[node_id] = count
 
     # Créer un dictionnaire pour suivre les nœuds qui ont été mis à jour
     updated_nodes = {}
 
-    # Parcourir les nœuds dans l'ordre topologique
-    for node_id in topo_order:
-        node = graph.get_node(node_id)
-        if not node:
-            continue
-
-        # Obtenir les prédécesseurs
-        predecessors = graph.get_predecessors(node_id)
-
-        # 1. Si le nœud est "in_progress", vérifier s'il peut être complété
-        if node.status == "in_progress":
-            # Compléter automatiquement un nœud "in_progress"
-            graph.update_node_status(node_id, "completed")
-            updated_nodes[node_id] = "completed"
-
-        # 2. Si le nœud est "pending", vérifier s'il peut être mis "in_progress"
-        elif node.status == "pending":
-            # Un nœud peut passer à "in_progress" si tous ses prédécesseurs sont "completed"
-            all_deps_completed = all(
-                graph.get_node(pred_id).status == "completed"
-                for pred_id in predecessors
-            )
-
-            if all_deps_completed:
-                graph.update_node_status(node_id, "in_progress")
-                updated_nodes[node_id] = "in_progress"
+    # 1. Compléter les nœuds "in_progress" et débloquer leurs successeurs ;
+    # l'ordre n'importe pas, aucun ordre topologique n'est nécessaire
+    started = [
+        node_id
+        for node_id, node in graph.nodes_iter()
+        if node.status == "in_progress"
+    ]
+    for node_id in started:
+        graph.update_node_status(node_id, "completed")
+        updated_nodes[node_id] = "completed"
+        for succ_id in graph.get_successors(node_id):
+            if succ_id in remaining:
+                remaining[succ_id] -= 1
+
+    # 2. Un nœud "pending" passe à "in_progress" quand tous ses
+    # prédécesseurs sont "completed"
+    for node_id, node in graph.nodes_iter():
+        if node.status == "pending" and remaining[node_id] == 0:
+            graph.update_node_status(node_id, "in_progress")
+            updated_nodes[node_id] = "in_progress"
 
     # Afficher un récapitulatif des changements
     if updated_nodes:
@@ -146,19 +194,205 @@ def advance_graph():
         )
 
 
+# Graphs above this size use Graphviz sfdp instead of planar/dot layouts
+SFDP_MIN_NODES = 200
+# Only graphs this small are probed for planarity; larger task graphs are
+# rarely planar, so the test would mostly be wasted
+PLANAR_MAX_NODES = 8
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def compute_layout(nodes: tuple, edges: tuple) -> dict:
+    """Compute node positions for the graph view.
+
+    Cached on the graph topology, so reruns that only change node statuses
+    reuse the previous layout.
+    """
+    G = nx.DiGraph()
+    G.add_nodes_from(nodes)
+    G.add_edges_from(edges)
+
+    try:
+        if G.number_of_nodes() > SFDP_MIN_NODES:
+            # Multilevel Barnes-Hut layout, O(n log n) on large graphs
+            pos = nx.nx_pydot.pydot_layout(G, prog="sfdp")
+        elif G.number_of_nodes() <= PLANAR_MAX_NODES and nx.is_planar(G):
+            pos = nx.planar_layout(G)
+        else:
+            # Assurez-vous que pydot est installé: pip install pydot graphviz
+            pos = nx.nx_pydot.pydot_layout(G, prog="dot")
+    except Exception:
+        # Fallback to a force-directed layout if Graphviz is unavailable;
+        # each iteration is quadratic in the node count, so large graphs
+        # get fewer of them
+        n = max(1, G.number_of_nodes())
+        pos = lbfgs_layout(G, seed=42, max_iter=min(100, max(10, 10000 // n)))
+
+    # Plotly's WebGL traces consume float32, so store positions that way
+    return {
+        node_id: (np.float32(x), np.float32(y))
+        for node_id, (x, y) in pos.items()
+    }
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_graph_figure(nodes: tuple, edges: tuple, _pos: dict) -> go.Figure:
+    """Build the Plotly figure for the graph view, without node statuses.
+
+    ``nodes`` holds ``(node_id, description)`` tuples and ``edges``
+    ``(source, target)`` pairs; together they fingerprint the figure, so
+    reruns that keep the graph's shape reuse the cached one. ``_pos`` is
+    derived from that topology and is not hashed. Colors and labels are
+    filled in by ``style_graph_figure``.
+    """
+    # Create node traces
+    node_ids = [node_id for node_id, _ in nodes]
+    coords = np.array(
+        [_pos[node_id] for node_id in node_ids], dtype=np.float32
+    )
+    node_x = coords[:, 0]
+    node_y = coords[:, 1]
+    node_text = [
+        "<br>".join(LABEL_WRAPPER.wrap(desc)) or desc for _, desc in nodes
+    ]
+
+    node_trace = go.Scattergl(
+        x=node_x,
+        y=node_y,
+        mode="markers",
+        hovertext=node_text,
+        customdata=node_ids,
+        hoverinfo="text",
+        marker=dict(
+            showscale=False,
+            color=np.zeros(len(node_ids), dtype=np.uint8),
+            cmin=0,
+            cmax=len(STATUS_PALETTE) - 1,
+            colorscale=STATUS_COLORSCALE,
+            size=60,
+            line_width=2,
+        ),
+        unselected=dict(marker=dict(opacity=0.1)),
+    )
+
+    label_trace = go.Scattergl(
+        x=[],
+        y=[],
+        mode="text",
+        text=[],
+        textposition="top center",
+        hoverinfo="none",
+        textfont=dict(
+            size=12,
+        ),
+    )
+
+    # Toutes les arêtes dans une seule trace, séparées par NaN,
+    # calculées en bloc avec NumPy
+    node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+    n_edges = len(edges)
+    src = np.fromiter((node_index[s] for s, _ in edges), np.intp, n_edges)
+    dst = np.fromiter((node_index[t] for _, t in edges), np.intp, n_edges)
+    delta = coords[dst] - coords[src]
+    # Éviter les arêtes de longueur nulle
+    keep = np.any(delta != 0, axis=1)
+    origin = coords[src][keep]
+    delta = delta[keep]
+
+    # Réduire la longueur pour ne pas superposer les nœuds
+    # Ajuster ces valeurs selon la taille de vos nœuds
+    segments = np.full((len(delta), 3, 2), np.nan, dtype=np.float32)
+    segments[:, 0] = origin + 0.15 * delta
+    segments[:, 1] = origin + 0.85 * delta
+    edge_x = segments[:, :, 0].ravel()
+    edge_y = segments[:, :, 1].ravel()
+
+    edge_trace = go.Scattergl(
+        x=edge_x,
+        y=edge_y,
+        mode="lines",
+        line=dict(color="#888", width=2),
+        hoverinfo="none",
+    )
+
+    # Pointes de flèche : un marqueur orienté au bout de chaque arête
+    arrow_angles = np.degrees(np.arctan2(delta[:, 0], delta[:, 1]))
+    arrow_trace = go.Scattergl(
+        x=segments[:, 1, 0],
+        y=segments[:, 1, 1],
+        mode="markers",
+        marker=dict(
+            symbol="triangle-up",
+            angle=arrow_angles,
+            size=12,
+            color="#888",
+        ),
+        hoverinfo="none",
+    )
+
+    return go.Figure(
+        data=[edge_trace, arrow_trace, node_trace, label_trace],
+        layout=go.Layout(
+            showlegend=False,
+            hovermode="closest",
+            margin=dict(b=20, l=5, r=5, t=40),
+            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            # Même échelle sur les deux axes : les angles des flèches,
+            # calculés dans l'espace des données, restent alignés à l'écran
+            yaxis=dict(
+                showgrid=False,
+                zeroline=False,
+                showticklabels=False,
+                scaleanchor="x",
+                scaleratio=1,
+            ),
+            height=600,
+            clickmode="event+select",
+            # Conserver le zoom/pan tant que la topologie ne change pas ;
+            # un nouveau graphe repart de la vue complète
+            uirevision=str(hash((nodes, edges))),
+        ),
+    )
+
+
+def style_graph_figure(fig: go.Figure, statuses: tuple, selected_node):
+    """Color the nodes of a graph figure and label the ones that matter."""
+    node_trace, label_trace = fig.data[2], fig.data[3]
+    color_idx = np.fromiter(
+        (STATUS_INDEX.get(status, 0) for status in statuses),
+        np.uint8,
+        len(statuses),
+    )
+    node_trace.marker.color = color_idx
+
+    # Étiquettes visibles uniquement pour le nœud sélectionné et les
+    # nœuds en cours ; les autres n'ont que le survol
+    labelled = [
+        idx
+        for idx, node_id in enumerate(node_trace.customdata)
+        if color_idx[idx] == STATUS_INDEX["in_progress"]
+        or node_id == selected_node
+    ]
+    label_trace.x = node_trace.x[labelled]
+    label_trace.y = node_trace.y[labelled]
+    label_trace.text = [node_trace.hovertext[idx] for idx in labelled]
+
+
 # UI Layout
 st.title("🧠 GMind - Task Planning Orchestrator")
 
 # Sidebar for controls
 with st.sidebar:
     st.header("Create New Plan")
-    st.text_area(
-        "Enter your goal",
-        key="goal_input",
-        height=100,
-        placeholder="Describe what you want to accomplish...",
-    )
-    st.button("Generate Plan", on_click=create_graph_from_goal)
+    # Les formulaires ne relancent le script qu'à la soumission
+    with st.form("goal_form", border=False):
+        st.text_area(
+            "Enter your goal",
+            key="goal_input",
+            height=100,
+            placeholder="Describe what you want to accomplish...",
+        )
+        st.form_submit_button("Generate Plan", on_click=create_graph_from_goal)
 
     st.divider()
 
@@ -170,293 +404,262 @@ with st.sidebar:
     st.divider()
 
     st.header("Add Task Manually")
-    st.text_input("Task Description", key="new_task_description")
-    st.text_input(
-        "Dependencies (comma-separated IDs)", key="new_task_dependencies"
-    )
-    st.button("Add Task", on_click=add_task_manually)
+    with st.form("task_form", clear_on_submit=True, border=False):
+        st.text_input("Task Description", key="new_task_description")
+        st.text_input(
+            "Dependencies (comma-separated IDs)", key="new_task_dependencies"
+        )
+        st.form_submit_button("Add Task", on_click=add_task_manually)
 
     st.divider()
 
-    if st.session_state.graph.nodes:
+    graph = st.session_state.graph
+    if graph.nodes:
+        # Only re-serialize the graph after it has been modified
+        export_cache = st.session_state.get("_export_cache")
+        if (
+            export_cache
+            and export_cache[0] is graph
+            and export_cache[1] == graph.version
+        ):
+            export_data = export_cache[2]
+        else:
+            export_data = msgspec.json.format(graph.to_json_bytes(), indent=2)
+            st.session_state._export_cache = (
+                graph,
+                graph.version,
+                export_data,
+            )
         st.download_button(
             label="Export Graph",
-            data=json.dumps(st.session_state.graph.to_dict(), indent=2),
+            data=export_data,
             file_name="task_graph.json",
             mime="application/json",
         )
 
-# Main area with tabs
-tab1, tab2 = st.tabs(["Graph View", "Task List"])
-with tab1:
+
+# Main area views
+@st.fragment
+def render_graph_tab():
+    """Graph view, rerun on its own when the chart is interacted with."""
+    if st.session_state.pop("_selection_changed", False):
+        # A click selected another node: redraw the sidebar panel too
+        st.rerun()
+
     # Graph visualization
     if not st.session_state.graph.nodes:
         st.info("No tasks in the graph. Create a plan or add tasks manually.")
     else:
-        # Create NetworkX graph for visualization
-        G = st.session_state.graph.to_networkx()
+        graph = st.session_state.graph
+        edge_pairs = set(graph.edges_iter())
+        edges_key = tuple(sorted(edge_pairs))
 
         try:
-            # Compute layout
-            try:
-                if nx.is_planar(G):
-                    pos = nx.planar_layout(G)
+            # Compute layout, reusing this session's last one when the
+            # topology is unchanged
+            topo_hash = hash((frozenset(graph.nodes), frozenset(edge_pairs)))
+            layout_cache = st.session_state.get("_layout_cache")
+            if layout_cache and layout_cache[0] == topo_hash:
+                pos = layout_cache[1]
+            else:
+                pos = compute_layout(tuple(sorted(graph.nodes)), edges_key)
+                st.session_state._layout_cache = (topo_hash, pos)
+
+            nodes_payload = []
+            statuses = []
+            for node_id in pos:
+                node = graph.get_node(node_id)
+                if node:
+                    nodes_payload.append((node_id, node.description))
+                    statuses.append(node.status)
                 else:
-                    # Assurez-vous que pydot est installé: pip install pydot graphviz
-                    pos = nx.nx_pydot.pydot_layout(G, prog="dot")
-            except:
-                # Fallback to spring layout if other methods fail
-                pos = nx.spring_layout(G)
-
-            # Node status colors
-            status_colors = {
-                "pending": "lightgray",  # Gris pour pending
-                "in_progress": "blue",  # Vous pouvez ajuster cette couleur
-                "completed": "green",  # Vert pour done
-                "failed": "red",  # Rouge pour fail
-            }
-
-            # Create edge traces
-            node_x = []
-            node_y = []
-            node_text = []
-            node_colors = []
-            node_ids = []
-
-            for node_id in G.nodes():
-                x, y = pos[node_id]
-                node_x.append(x)
-                node_y.append(y)
-                node_ids.append(node_id)
-
-                node = st.session_state.graph.get_node(node_id)
-                status = node.status if node else "pending"
-                desc = node.description if node else "Unknown"
-
-                # Word-wrap le texte à 20 caractères par ligne
-                wrapped_text = "<br>".join(
-                    [desc[i : i + 20] for i in range(0, len(desc), 20)]
-                )
-                node_text.append(wrapped_text)
-                node_colors.append(status_colors.get(status, "gray"))
-
-            node_trace = go.Scatter(
-                x=node_x,
-                y=node_y,
-                mode="markers+text",
-                text=node_text,
-                textposition="top center",
-                customdata=node_ids,
-                hoverinfo="text",
-                marker=dict(
-                    showscale=False, color=node_colors, size=60, line_width=2
-                ),
-                textfont=dict(
-                    size=12,
-                ),
-            )
-
-            # Utilisation des annotations pour les flèches
-            fig = go.Figure(
-                data=[node_trace],
-                layout=go.Layout(
-                    showlegend=False,
-                    hovermode="closest",
-                    margin=dict(b=20, l=5, r=5, t=40),
-                    xaxis=dict(
-                        showgrid=False, zeroline=False, showticklabels=False
-                    ),
-                    yaxis=dict(
-                        showgrid=False, zeroline=False, showticklabels=False
-                    ),
-                    height=600,
-                    clickmode="event+select",
-                    annotations=[],
-                ),
+                    nodes_payload.append((node_id, "Unknown"))
+                    statuses.append("pending")
+            nodes_payload = tuple(nodes_payload)
+
+            # Keep this session's figure while the graph's shape is
+            # unchanged, and only restyle it when statuses or the
+            # selection move
+            figure_key = hash((nodes_payload, edges_key))
+            style_key = (tuple(statuses), st.session_state.selected_node)
+            figure_cache = st.session_state.get("_figure_cache")
+            if figure_cache and figure_cache[0] == figure_key:
+                fig = figure_cache[2]
+            else:
+                fig = build_graph_figure(nodes_payload, edges_key, pos)
+                figure_cache = None
+            if not figure_cache or figure_cache[1] != style_key:
+                style_graph_figure(fig, *style_key)
+                st.session_state._figure_cache = (figure_key, style_key, fig)
+
+            # Display the graph; clicking a node selects it through a
+            # callback that runs before the rerun
+            st.plotly_chart(
+                fig,
+                use_container_width=True,
+                key="graph_plot",
+                on_select=select_node_from_chart,
+                selection_mode="points",
             )
 
-            # Ajouter les flèches comme annotations
-            for edge in G.edges():
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
-
-                # Calculer la direction
-                dx, dy = x1 - x0, y1 - y0
-                dist = (dx**2 + dy**2) ** 0.5
-                if dist == 0:  # Éviter division par zéro
-                    continue
-
-                # Réduire la longueur pour ne pas superposer les nœuds
-                # Ajuster ces valeurs selon la taille de vos nœuds
-                shrink_factor = 0.85
-                end_x = x0 + dx * shrink_factor
-                end_y = y0 + dy * shrink_factor
-                start_x = (
-                    x0 + dx * 0.15
-                )  # Début de la flèche décalé du centre du nœud source
-                start_y = y0 + dy * 0.15
-
-                fig.add_annotation(
-                    x=end_x,
-                    y=end_y,
-                    ax=start_x,
-                    ay=start_y,
-                    xref="x",
-                    yref="y",
-                    axref="x",
-                    ayref="y",
-                    showarrow=True,
-                    arrowhead=2,  # Style de la flèche
-                    arrowsize=1.5,  # Taille de la tête de flèche
-                    arrowwidth=2,  # Largeur de la ligne
-                    arrowcolor="#888",
-                )
-
-            # Display the graph
-            selected_node = st.plotly_chart(
-                fig, use_container_width=True, key="graph_plot"
-            )
-
-            # Handle node selection
-            if (
-                selected_node
-                and isinstance(selected_node, dict)
-                and "points" in selected_node
-            ):
-                for point in selected_node["points"]:
-                    if "customdata" in point:
-                        select_node(point["customdata"])
-
         except Exception as e:
             st.error(f"Error rendering graph: {str(e)}")
             # Fallback simple representation
             st.write("Task nodes:")
-            for node_id, node in st.session_state.graph.nodes.items():
+            for node_id, node in graph.nodes_iter():
                 st.write(f"- {node.description} ({node.status})")
 
-with tab2:
+
+@st.fragment
+def render_task_list():
+    """Task list view, rerun on its own when the table is interacted with."""
     # Task list view
     if not st.session_state.graph.nodes:
         st.info("No tasks in the graph. Create a plan or add tasks manually.")
     else:
         st.subheader("All Tasks")
+        graph = st.session_state.graph
 
         # Sort nodes by status
-        tasks_by_status = {
-            "in_progress": [],
-            "pending": [],
-            "completed": [],
-            "failed": [],
-        }
-
-        for node_id, node in st.session_state.graph.nodes.items():
+        tasks_by_status = defaultdict(list)
+        for node_id, node in graph.nodes_iter():
             tasks_by_status[node.status].append((node_id, node))
 
-        # Display tasks grouped by status
-        for status, color in [
-            ("in_progress", "🟠 In Progress"),
-            ("pending", "⚪ Pending"),
-            ("completed", "🟢 Completed"),
-            ("failed", "🔴 Failed"),
-        ]:
-            st.write(f"### {color}")
-
-            if not tasks_by_status[status]:
-                st.write("No tasks in this status.")
-                continue
-
-            for node_id, node in tasks_by_status[status]:
-                col1, col2 = st.columns([3, 1])
-
-                with col1:
-                    st.write(f"**{node.description}**")
-                    st.write(f"ID: `{node_id}`")
-
-                with col2:
-                    new_status = st.selectbox(
-                        "Status",
-                        options=[
-                            "pending",
-                            "in_progress",
-                            "completed",
-                            "failed",
-                        ],
-                        index=[
-                            "pending",
-                            "in_progress",
-                            "completed",
-                            "failed",
-                        ].index(node.status),
-                        key=f"status_{node_id}",
-                    )
-
-                    if new_status != node.status:
-                        update_node_status(node_id, new_status)
-                        st.rerun()
-
-                # Show dependencies
-                predecessors = st.session_state.graph.get_predecessors(node_id)
-                if predecessors:
-                    pred_nodes = [
-                        st.session_state.graph.get_node(p) for p in predecessors
-                    ]
+        # One table for every task instead of a row of widgets per task
+        rows = []
+        for status in STATUS_ORDER:
+            for node_id, node in tasks_by_status.get(status, ()):
+                # Texte des dépendances : rien à joindre pour les tâches
+                # sans prédécesseur ou avec un seul
+                pred_text = ""
+                preds = graph.get_predecessors(node_id)
+                if len(preds) == 1:
+                    pred = graph.get_node(preds[0])
+                    if pred:
+                        pred_text = pred.description
+                elif preds:
                     pred_text = ", ".join(
-                        [f"{n.description}" for n in pred_nodes if n]
+                        pred.description
+                        for pred in map(graph.get_node, preds)
+                        if pred
                     )
-                    st.write(f"**Dependencies:** {pred_text}")
+                rows.append(
+                    {
+                        "id": node_id,
+                        "description": node.description,
+                        "status": NodeStatus(node.status).value,
+                        "dependencies": pred_text,
+                    }
+                )
+
+        # Status edits are batched in a form and applied in one rerun
+        editor_key = f"tasks_editor_{st.session_state.tasks_editor_version}"
+        node_ids = [row["id"] for row in rows]
+        with st.form("task_list_form", border=False):
+            st.data_editor(
+                pd.DataFrame(rows),
+                column_config={
+                    "id": st.column_config.TextColumn("ID"),
+                    "description": st.column_config.TextColumn("Task"),
+                    "status": st.column_config.SelectboxColumn(
+                        "Status",
+                        options=STATUS_OPTIONS,
+                        required=True,
+                    ),
+                    "dependencies": st.column_config.TextColumn(
+                        "Dependencies"
+                    ),
+                },
+                disabled=["id", "description", "dependencies"],
+                hide_index=True,
+                key=editor_key,
+            )
+            if st.form_submit_button(
+                "Apply changes",
+                on_click=apply_task_list_edits,
+                args=(editor_key, node_ids),
+            ):
+                # Status changes recolor the graph, so rerun the whole app
+                st.rerun()
+
+
+# Un seul affichage est exécuté à la fois, contrairement à st.tabs qui
+# exécute le contenu de tous les onglets
+view = st.segmented_control(
+    "View",
+    ["Graph View", "Task List"],
+    default="Graph View",
+    key="active_view",
+    label_visibility="collapsed",
+)
+if view == "Task List":
+    render_task_list()
+else:
+    render_graph_tab()
 
-                st.divider()
 
 # Detail panel for selected node
-if st.session_state.selected_node:
-    st.sidebar.header("Task Details")
+@st.fragment
+def render_detail_panel():
+    """Sidebar details for the selected node.
+
+    Runs as a fragment so that picking a value in its selectbox reruns only
+    the panel; its buttons still rerun the whole app since they change the
+    graph.
+    """
+    st.header("Task Details")
 
-    node = st.session_state.graph.get_node(st.session_state.selected_node)
+    graph = st.session_state.graph
+    node_id = st.session_state.selected_node
+    node = graph.get_node(node_id)
     if node:
-        st.sidebar.subheader(node.description)
-        st.sidebar.write(f"**Status:** {node.status}")
+        st.subheader(node.description)
+        st.write(f"**Status:** {node.status}")
 
         # Change status
-        new_status = st.sidebar.selectbox(
+        new_status = st.selectbox(
             "Update Status",
-            options=["pending", "in_progress", "completed", "failed"],
-            index=["pending", "in_progress", "completed", "failed"].index(
-                node.status
-            ),
+            options=STATUS_OPTIONS,
+            index=STATUS_INDEX[node.status],
         )
 
-        if st.sidebar.button("Update Status"):
-            update_node_status(st.session_state.selected_node, new_status)
+        if st.button("Update Status"):
+            update_node_status(node_id, new_status)
             st.rerun()
 
         # Dependencies
-        predecessors = st.session_state.graph.get_predecessors(
-            st.session_state.selected_node
-        )
+        predecessors = graph.get_predecessors(node_id)
         if predecessors:
-            st.sidebar.subheader("Dependencies")
+            st.subheader("Dependencies")
             for pred_id in predecessors:
-                pred_node = st.session_state.graph.get_node(pred_id)
+                pred_node = graph.get_node(pred_id)
                 if pred_node:
-                    st.sidebar.write(
-                        f"- {pred_node.description} ({pred_node.status})"
-                    )
+                    st.write(f"- {pred_node.description} ({pred_node.status})")
 
         # Dependent tasks
-        successors = st.session_state.graph.get_successors(
-            st.session_state.selected_node
-        )
+        successors = graph.get_successors(node_id)
         if successors:
-            st.sidebar.subheader("Dependent Tasks")
+            st.subheader("Dependent Tasks")
             for succ_id in successors:
-                succ_node = st.session_state.graph.get_node(succ_id)
+                succ_node = graph.get_node(succ_id)
                 if succ_node:
-                    st.sidebar.write(
-                        f"- {succ_node.description} ({succ_node.status})"
-                    )
+                    st.write(f"- {succ_node.description} ({succ_node.status})")
 
         # Delete node
-        if st.sidebar.button("Delete Task", type="primary"):
-            st.session_state.graph.remove_node(st.session_state.selected_node)
+        if st.button("Delete Task", type="primary"):
+            graph.remove_node(node_id)
             st.session_state.selected_node = None
             st.rerun()
+
+
+# Drop a selection whose node no longer exists (e.g. after a deletion or a
+# new plan) instead of rendering an empty panel on every rerun
+if (
+    st.session_state.selected_node
+    and st.session_state.selected_node not in st.session_state.graph.nodes
+):
+    st.session_state.selected_node = None
+
+if st.session_state.selected_node:
+    with st.sidebar:
+        render_detail_panel()